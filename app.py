@@ -3,53 +3,116 @@ EdgeCoach AI - Streamlit frontend
 
 This module renders the chat UI and talks to the Lambda backend. It:
 - Sends user queries plus history to the Function URL.
-- Normalizes Lambda responses and preserves backend messages.
+- Normalizes Lambda responses and preserves backend messages and agent state.
+- Renders streamed answer events into the chat as they arrive from the backend.
 - Renders chat bubbles with optional web source expanders.
 """
 import json
-from html import escape
-from typing import Any, Dict, List
+import os
+import re
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
 
 import requests
 import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None
 
 # ==========================
 # CONFIG
 # ==========================
 
 API_URL = "https://wmppa4oufkcu4bx6xv2g77uoge0goofg.lambda-url.us-east-1.on.aws/"
+# Only the most recent turns are forwarded; the backend trims further server-side.
+MAX_HISTORY_MESSAGES = 16
+# The Lambda handler returns its NDJSON events in one buffered body, so streaming
+# only adds bytes until a real streaming entrypoint exists. Opt in with
+# EDGECOACH_STREAM_ANSWERS=1.
+STREAM_ANSWERS = os.getenv("EDGECOACH_STREAM_ANSWERS", "0") == "1"
+STREAM_MIN_INTERVAL = 0.08
+STREAM_MIN_CHARS = 16
+
+# Past these sizes markdown rendering gets pathologically slow; show plain text.
+MARKDOWN_MAX_CHARS = 20_000
+MARKDOWN_MAX_LINES = 500
+
+# Same replacements as html.escape(quote=True), applied in one C-level pass.
+_HTML_ESCAPES = {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#x27;"}
+_ESCAPE_TABLE = str.maketrans(_HTML_ESCAPES)
+
+# One pooled keep-alive session for every chat turn, so the TLS handshake to
+# the Function URL is paid once per process instead of once per message.
+SESSION = requests.Session()
+SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504]),
+    ),
+)
+SESSION.headers.update({"Content-Type": "application/json", "Connection": "keep-alive"})
 
 
 # ==========================
 # HELPERS
 # ==========================
 
-def md_to_html(value: str) -> str:
+def _escape(value: str) -> str:
+    return value.translate(_ESCAPE_TABLE)
+
+
+def _json_loads(raw: Any) -> Any:
     """
-    Very small markdown-to-HTML helper.
-    Streamlit renders markdown directly, so this is only used
-    for minimal escaping (if needed later).
+    Parse JSON with orjson when available (str or bytes), stdlib otherwise.
+    orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch one type.
     """
-    safe = escape(value or "")
-    return safe.replace("\n", "<br>")
+    if orjson:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _minify_css(css: str) -> str:
+    """
+    Strip comments and redundant whitespace from a <style> block so the
+    per-rerun CSS element is as small as possible on the websocket.
+    """
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    return css.strip()
+
+
+def is_oversized(content: str) -> bool:
+    return len(content) > MARKDOWN_MAX_CHARS or content.count("\n") > MARKDOWN_MAX_LINES
 
 
 def normalize_lambda_payload(raw: Any) -> Dict[str, Any]:
     """
     Normalize the Lambda HTTP response body into a dict with:
-      { intent, answer, sources, messages }
+      { intent, answer, sources, messages, agent_state }
     Handles both:
       - direct JSON
       - { "statusCode": 200, "body": "{...}" }
     """
     data = raw
 
+    # Fast path: Function URLs hand back the payload itself, not an envelope
+    if isinstance(data, dict) and "answer" in data and "body" not in data:
+        return data
+
     # If we already have a dict and it has "body", unwrap
     if isinstance(data, dict) and "body" in data and len(data.keys()) <= 3:
         body_val = data.get("body")
         if isinstance(body_val, str):
             try:
-                data = json.loads(body_val)
+                data = _json_loads(body_val)
             except json.JSONDecodeError as exc:
                 raise ValueError("Lambda returned invalid JSON in 'body'.") from exc
         elif isinstance(body_val, dict):
@@ -65,51 +128,202 @@ def normalize_lambda_payload(raw: Any) -> Dict[str, Any]:
     return data
 
 
-def call_backend(query: str, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+def throttle(
+    chunks: Iterable[str],
+    min_interval: float = STREAM_MIN_INTERVAL,
+    min_chars: int = STREAM_MIN_CHARS,
+) -> Iterator[str]:
+    """
+    Coalesce streamed text so the UI re-renders at ~10-20 Hz instead of once
+    per token. A batch is released only when `min_interval` seconds have passed
+    AND at least `min_chars` characters are pending; the rest is flushed when
+    the stream ends.
+    """
+    pending: List[str] = []
+    pending_chars = 0
+    last = time.monotonic()
+    for chunk in chunks:
+        if not chunk:
+            continue
+        pending.append(chunk)
+        pending_chars += len(chunk)
+        now = time.monotonic()
+        if now - last >= min_interval and pending_chars >= min_chars:
+            yield "".join(pending)
+            pending.clear()
+            pending_chars = 0
+            last = now
+    if pending:
+        yield "".join(pending)
+
+
+def _iter_stream_deltas(resp: requests.Response, final: Dict[str, Any]) -> Iterator[str]:
+    """
+    Yield answer deltas from the backend's newline-delimited JSON stream and
+    stash the terminating (non-delta) event in `final`.
+    """
+    # chunk_size=None hands over bytes as soon as they arrive instead of
+    # waiting for a full 512-byte read, so short delta lines are not held back.
+    for line in resp.iter_lines(chunk_size=None):
+        if not line:
+            continue
+        try:
+            event = _json_loads(line)
+        except json.JSONDecodeError as exc:
+            raise ValueError("Lambda returned an invalid stream event.") from exc
+
+        if isinstance(event, dict) and event.get("type") == "delta":
+            yield str(event.get("text") or "")
+        else:
+            final["event"] = event
+
+
+def call_backend(
+    query: str,
+    messages: List[Dict[str, Any]],
+    agent_state: Optional[Dict[str, Any]] = None,
+    on_delta: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
     """
-    Call the Lambda backend with the current query and full message history.
+    Call the Lambda backend with the current query, recent message history and
+    the agent state (company, role, sources) returned by the previous turn.
+    With STREAM_ANSWERS the backend answers with newline-delimited JSON events;
+    each answer delta is passed to `on_delta` (coalesced by `throttle`) and the
+    final event is returned. Otherwise the plain JSON payload is returned.
     """
-    payload = {"query": query, "messages": messages}
-    resp = requests.post(API_URL, json=payload, timeout=60)
-    resp.raise_for_status()
+    messages = messages[-MAX_HISTORY_MESSAGES:] if isinstance(messages, list) else []
+    agent_state = agent_state if isinstance(agent_state, dict) else {}
+
+    payload = {
+        "query": query,
+        "messages": messages,
+        "agent_state": agent_state,
+        "stream": STREAM_ANSWERS,
+    }
+    if not STREAM_ANSWERS:
+        resp = SESSION.post(API_URL, json=payload, timeout=60)
+        resp.raise_for_status()
+        return normalize_lambda_payload(_json_loads(resp.content))
+
+    final: Dict[str, Any] = {}
+    with SESSION.post(
+        API_URL,
+        json=payload,
+        headers={"Accept": "application/x-ndjson"},
+        timeout=60,
+        stream=True,
+    ) as resp:
+        resp.raise_for_status()
+        for batch in throttle(_iter_stream_deltas(resp, final)):
+            if on_delta:
+                on_delta(batch)
+
+    return normalize_lambda_payload(final.get("event"))
+
+
+def _split_markdown_blocks(text: str) -> List[str]:
+    """
+    Split markdown on blank lines, keeping fenced code blocks in one piece.
+    The last element is the trailing (possibly still growing) block.
+    """
+    blocks: List[str] = []
+    current = ""
+    for part in text.split("\n\n"):
+        current = f"{current}\n\n{part}" if current else part
+        if current.count("```") % 2 == 0:
+            blocks.append(current)
+            current = ""
+    if current:
+        blocks.append(current)
+    return blocks
+
+
+def markdown_stream_writer() -> Callable[[str], None]:
+    """
+    Build an `on_delta` callback that renders streamed markdown in place.
+    Completed blocks are written once and then left alone; only the trailing
+    block is re-rendered as new text arrives, so each delta costs one small
+    markdown parse instead of a re-parse of the whole answer.
+    """
+    state: Dict[str, Any] = {"pending": "", "slot": st.empty()}
+
+    def write(delta: str) -> None:
+        *completed, trailing = _split_markdown_blocks(state["pending"] + delta)
+        for block in completed:
+            if block.strip():
+                state["slot"].markdown(block)
+                state["slot"] = st.empty()
+        state["pending"] = trailing
+        if trailing.strip():
+            state["slot"].markdown(trailing)
+
+    return write
 
-    raw_json: Any = resp.json()
-    normalized = normalize_lambda_payload(raw_json)
-    return normalized
 
+def _clean(data: Dict[str, Any], key: str, default: str = "") -> str:
+    return str(data.get(key) or "").strip() or default
 
-def render_sources_block(sources: List[Dict[str, Any]]) -> None:
+
+def normalize_sources(sources: List[Any]) -> List[Dict[str, str]]:
+    """
+    Clean backend source dicts once, when the answer arrives, into the
+    { url, title, domain, snippet } cards that render_sources_block reads.
+    """
+    cards: List[Dict[str, str]] = []
+    for src in sources:
+        if not isinstance(src, dict):
+            continue
+        url = _clean(src, "url")
+        cards.append(
+            {
+                "url": url,
+                "title": _clean(src, "title", url or "Untitled"),
+                "domain": _clean(src, "source", "web"),
+                "snippet": _clean(src, "snippet"),
+            }
+        )
+    return cards
+
+
+def render_sources_block(sources: List[Dict[str, str]]) -> None:
     """
     Render 'Web Sources Used' cards under the assistant message.
-    Only called when there are actually some sources.
+    Only called when there are actually some sources, already passed
+    through normalize_sources.
+    All cards go out as a single HTML element (collapsible <details> blocks)
+    instead of one Streamlit expander component per source.
     """
     if not sources:
         return
 
-    st.markdown(
+    cards: List[str] = [
         "<div style='margin-top:0.75rem; font-size:0.7rem; "
         "text-transform:uppercase; letter-spacing:0.16em; "
-        "color:#7b87b9;'>Web Sources Used</div>",
-        unsafe_allow_html=True,
-    )
+        "color:#7b87b9;'>Web Sources Used</div>"
+    ]
 
     for idx, src in enumerate(sources, start=1):
-        url = str(src.get("url") or "").strip()
-        title = str(src.get("title") or url or "Untitled").strip()
-        domain = str(src.get("source") or "").strip() or "web"
-        snippet = str(src.get("snippet") or "").strip()
-
-        label = f"Source {idx} - {domain}"
-
-        with st.expander(label, expanded=False):
-            # Title with link
-            if url:
-                st.markdown(f"**[{title}]({url})**")
-            else:
-                st.markdown(f"**{title}**")
+        url = src["url"]
+        title = _escape(src["title"])
+        domain = _escape(src["domain"])
+        snippet = src["snippet"]
+
+        # Title with link (only for real web URLs)
+        if url.startswith(("http://", "https://")):
+            heading = f"<a href='{_escape(url)}' target='_blank'>{title}</a>"
+        else:
+            heading = title
+
+        cards.append(
+            "<details style='margin-top:0.5rem; padding:0.55rem 0.85rem; "
+            "border:1px solid #d9e2ff; border-radius:12px; background:#ffffff;'>"
+            f"<summary style='cursor:pointer;'>Source {idx} - {domain}</summary>"
+            f"<p style='margin:0.6rem 0 0 0;'><strong>{heading}</strong></p>"
+            + (f"<p style='margin:0.4rem 0 0 0;'>{_escape(snippet)}</p>" if snippet else "")
+            + "</details>"
+        )
 
-            if snippet:
-                st.markdown(f"\n{snippet}")
+    st.markdown("".join(cards), unsafe_allow_html=True)
 
 
 def strip_system_messages(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -254,7 +468,11 @@ CUSTOM_CSS = """
 </style>
 """
 
-st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
+# Minified once at import. It is still emitted on every run: Streamlit drops
+# any element a rerun does not re-emit, so the styles would vanish otherwise.
+CUSTOM_CSS_MIN = _minify_css(CUSTOM_CSS)
+
+st.markdown(CUSTOM_CSS_MIN, unsafe_allow_html=True)
 
 st.markdown(
     "<div class='hero'>"
@@ -274,16 +492,24 @@ st.markdown("<hr class='hero-divider'/>", unsafe_allow_html=True)
 if "ui_messages" not in st.session_state:
     st.session_state["ui_messages"] = []
 
-# Full messages (including system state) sent to backend
+# Full messages sent to backend
 if "backend_messages" not in st.session_state:
     st.session_state["backend_messages"] = []
 
+# Agent state (company, role, sources) echoed back to the backend each turn
+if "agent_state" not in st.session_state:
+    st.session_state["agent_state"] = {}
+
 
 # ==========================
 # RENDER EXISTING CHAT
 # ==========================
 
-if not st.session_state["ui_messages"]:
+# Read first so the greeting is skipped on the run that submits the first
+# message; the input widget stays pinned to the bottom either way.
+prompt = st.chat_input("Send a message")
+
+if not st.session_state["ui_messages"] and not (prompt and prompt.strip()):
     with st.chat_message("assistant", avatar=ROLE_AVATARS.get("assistant")):
         st.markdown(
             "Hi, I'm EdgeCoach AI - your personal interview coach.\n\n"
@@ -297,7 +523,10 @@ else:
         sources = msg.get("sources") or []
 
         with st.chat_message(role, avatar=ROLE_AVATARS.get(role)):
-            st.markdown(content)
+            if is_oversized(content):
+                st.text(content)
+            else:
+                st.markdown(content)
 
             # Only assistants can have sources
             if role == "assistant" and sources:
@@ -308,76 +537,97 @@ else:
 # CHAT INPUT & BACKEND CALL
 # ==========================
 
-prompt = st.chat_input("Send a message")
-
 if prompt is not None:
     user_text = prompt.strip()
     if not user_text:
         st.warning("Please type something before sending.")
     else:
-        # 1) Append user message to UI state
+        # 1) Append user message to UI state and render it in place
         st.session_state["ui_messages"].append(
             {"role": "user", "content": user_text}
         )
 
+        with st.chat_message("user", avatar=ROLE_AVATARS.get("user")):
+            if is_oversized(user_text):
+                st.text(user_text)
+            else:
+                st.markdown(user_text)
+
         # 2) Call backend with full history (excluding this turn, query is sent separately)
-        try:
-            history_for_backend = st.session_state["backend_messages"]
-            response = call_backend(user_text, history_for_backend)
-        except requests.exceptions.RequestException:
-            # Network error -> append an assistant error message
-            st.session_state["ui_messages"].append(
-                {
-                    "role": "assistant",
-                    "content": (
+        #    and render the answer as it streams in. Only this turn is drawn here;
+        #    earlier turns were already rendered by the loop above, so no rerun is needed.
+        with st.chat_message("assistant", avatar=ROLE_AVATARS.get("assistant")):
+            answer_slot = st.empty()
+            streamed: List[str] = []
+            with answer_slot.container():
+                write_delta = markdown_stream_writer()
+
+                def on_delta(delta: str) -> None:
+                    streamed.append(delta)
+                    write_delta(delta)
+
+                try:
+                    history_for_backend = st.session_state["backend_messages"]
+                    response = call_backend(
+                        user_text,
+                        history_for_backend,
+                        agent_state=st.session_state["agent_state"],
+                        on_delta=on_delta,
+                    )
+                except requests.exceptions.RequestException:
+                    # Network error -> assistant error message
+                    response = None
+                    answer = (
                         "I couldn't reach the backend just now. "
                         "Please try again in a moment."
-                    ),
-                }
-            )
-        except ValueError:
-            # Parsing / shape error -> append an assistant error message
-            st.session_state["ui_messages"].append(
-                {
-                    "role": "assistant",
-                    "content": (
+                    )
+                except ValueError:
+                    # Parsing / shape error -> assistant error message
+                    response = None
+                    answer = (
                         "I received an unexpected response from the backend. "
                         "Let's try again."
-                    ),
-                }
-            )
-        else:
-            # 3) Update backend history with what Lambda returns
-            backend_messages = response.get("messages")
-            if isinstance(backend_messages, list):
-                st.session_state["backend_messages"] = backend_messages
-
-            intent = response.get("intent") or {}
-            if not isinstance(intent, dict):
-                intent = {}
-
-            answer = str(response.get("answer") or "").strip()
-            if not answer:
-                answer = "I don't have an answer for that yet."
-
-            all_sources = response.get("sources")
-            source_list: List[Dict[str, Any]] = (
-                all_sources if isinstance(all_sources, list) else []
-            )
-
-            show_sources = bool(intent.get("wants_interview_intel")) and bool(
-                source_list
-            )
-
-            ui_assistant_msg: Dict[str, Any] = {
-                "role": "assistant",
-                "content": answer,
-            }
-            if show_sources:
-                ui_assistant_msg["sources"] = source_list
-
-            # Append assistant message to UI state
-            st.session_state["ui_messages"].append(ui_assistant_msg)
-
-        # 4) Force a rerun so the top loop re-renders the full chat cleanly
-        st.rerun()
+                    )
+
+            ui_assistant_msg: Dict[str, Any] = {"role": "assistant"}
+            if response is not None:
+                # 3) Update backend history with what Lambda returns
+                backend_messages = response.get("messages")
+                if isinstance(backend_messages, list):
+                    st.session_state["backend_messages"] = backend_messages
+                agent_state = response.get("agent_state")
+                st.session_state["agent_state"] = agent_state if isinstance(agent_state, dict) else {}
+
+                intent = response.get("intent") or {}
+                if not isinstance(intent, dict):
+                    intent = {}
+
+                answer = str(response.get("answer") or "").strip()
+                if not answer:
+                    answer = "I don't have an answer for that yet."
+
+                all_sources = response.get("sources")
+                source_list: List[Dict[str, Any]] = (
+                    all_sources if isinstance(all_sources, list) else []
+                )
+
+                show_sources = bool(intent.get("wants_interview_intel")) and bool(
+                    source_list
+                )
+                if show_sources:
+                    ui_assistant_msg["sources"] = normalize_sources(source_list)
+
+            ui_assistant_msg["content"] = answer
+
+            # Non-streamed answers and errors never went through the
+            # stream writer; draw the final text once in place of the partial stream.
+            if is_oversized(answer):
+                answer_slot.text(answer)
+            elif "".join(streamed).strip() != answer:
+                answer_slot.markdown(answer)
+
+            if ui_assistant_msg.get("sources"):
+                render_sources_block(ui_assistant_msg["sources"])
+
+        # 4) Append assistant message to UI state for later reruns
+        st.session_state["ui_messages"].append(ui_assistant_msg)
@@ -3,36 +3,95 @@ EdgeCoach AI - RAG synthesis
 
 This module builds the interview synthesis prompt and calls Bedrock. It:
 - Formats sources into context blocks and composes the user prompt.
-- Invokes Claude to generate prep guidance and answer markdown.
+- Streams Claude's prep guidance and answer markdown from Bedrock.
 - Provides defaults when sources are missing or model calls fail.
 """
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Callable, Iterator, Optional
 import json
 import logging
 import os
+from itertools import chain
 
-import boto3
+from aws_clients import bedrock, system_prompt_field
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None
 
 MODEL_ID = os.getenv(
     "BEDROCK_ANALYSIS_MODEL_ID",
     "anthropic.claude-3-haiku-20240307-v1:0",
 )
 
-bedrock = boto3.client("bedrock-runtime")
 logger = logging.getLogger(__name__)
 
 MAX_SOURCES = 3
 MAX_SOURCE_CONTENT = 2500
-MAX_CONTEXT = 9000
+MAX_CONTEXT = 9000  # bytes (UTF-8)
 MAX_HISTORY_TURNS = 8
 
+_SYSTEM_PROMPT = """You are EdgeCoach AI — an energetic, encouraging, and highly skilled career mentor and interview coach. You speak with warmth, clarity, and confidence.
+
+Your core style:
+- Positive, motivating, and supportive.
+- Clear, structured explanations.
+- Teacher-like when the user asks any concept (ML, coding, stats, analytics,
+math, business, anything).
+- Interview-coach mode when the question relates to hiring, interviews,
+job roles, or career prep.
+- Never overwhelm — keep guidance practical and focused.
+- No inline citations like [S1] or weird source markers.
+
+When handling interview intel:
+- Deliver step-by-step insights, examples, and tailored preparation plans.
+- Combine empathy (“It's normal to feel nervous…”) with actionable advice.
+- Turn raw source context into clean, structured insights (flow, rounds,
+themes, prep plan, takeaways).
+
+When handling general knowledge:
+- Teach concepts clearly, with simple analogies and examples.
+- Maintain the same friendly, coach-like tone.
+
+Always:
+- Follow the format requested in the user prompt.
+- Be concise but impactful.
+- Reassure the user and help them grow in confidence."""
+
+
+def _json_dumps(payload: Any) -> bytes:
+    if orjson:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode("utf-8")
+
+
+def _json_loads(raw: Any) -> Any:
+    if orjson:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+# Everything but the user prompt is constant, so the request envelope is
+# serialized once at import and only the user prompt is encoded per call.
+_PAYLOAD_PREFIX = (
+    b'{"anthropic_version":"bedrock-2023-05-31","max_tokens":4000,"temperature":0.5,"system":'
+    + _json_dumps(system_prompt_field(_SYSTEM_PROMPT))
+    + b',"messages":[{"role":"user","content":[{"type":"text","text":'
+)
+_PAYLOAD_SUFFIX = b"}]}]}"
+
 
 def synthesize_interview_answer(
     user_query: str,
     intent: Dict[str, Any],
     sources: List[Dict[str, Any]],
     messages: List[Dict[str, Any]],
+    on_delta: Optional[Callable[[str], None]] = None,
 ) -> Dict[str, Any]:
+    """
+    Stream the EdgeCoach prep guide from Bedrock. Each text delta is handed to
+    `on_delta` as it arrives; the full markdown is returned once Claude is done.
+    """
     formatted_sources, context_block = _prepare_sources(sources)
     if not formatted_sources:
         return _default_response([])
@@ -53,45 +112,15 @@ def synthesize_interview_answer(
         user_query=user_query,
     )
 
-    payload = {
-    "anthropic_version": "bedrock-2023-05-31",
-    "max_tokens": 4000,
-    "temperature": 0.5,
-    "system": """You are EdgeCoach AI — an energetic, encouraging, and highly skilled career mentor and interview coach. You speak with warmth, clarity, and confidence.
-
-                Your core style:
-                - Positive, motivating, and supportive.
-                - Clear, structured explanations.
-                - Teacher-like when the user asks any concept (ML, coding, stats, analytics,
-                math, business, anything).
-                - Interview-coach mode when the question relates to hiring, interviews,
-                job roles, or career prep.
-                - Never overwhelm — keep guidance practical and focused.
-                - No inline citations like [S1] or weird source markers.
-
-                When handling interview intel:
-                - Deliver step-by-step insights, examples, and tailored preparation plans.
-                - Combine empathy (“It's normal to feel nervous…”) with actionable advice.
-                - Turn raw source context into clean, structured insights (flow, rounds,
-                themes, prep plan, takeaways).
-
-                When handling general knowledge:
-                - Teach concepts clearly, with simple analogies and examples.
-                - Maintain the same friendly, coach-like tone.
-
-                Always:
-                - Follow the format requested in the user prompt.
-                - Be concise but impactful.
-                - Reassure the user and help them grow in confidence.""",
-    "messages": [
-        {"role": "user", "content": [{"type": "text", "text": user_prompt}]},
-    ],
-}
-
+    body = _PAYLOAD_PREFIX + _json_dumps(user_prompt) + _PAYLOAD_SUFFIX
 
     try:
-        response_json = _invoke_bedrock(payload)
-        answer_markdown = _collect_text(response_json)
+        chunks: List[str] = []
+        for delta in _invoke_bedrock_stream(body):
+            chunks.append(delta)
+            if on_delta:
+                on_delta(delta)
+        answer_markdown = "".join(chunks).strip()
         if not answer_markdown:
             raise ValueError("Claude returned no content")
         return {
@@ -106,7 +135,11 @@ def synthesize_interview_answer(
 
 def _prepare_sources(sources: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], str]:
     formatted: List[Dict[str, Any]] = []
-    context_blocks: List[str] = []
+    context_parts: List[str] = []
+    # Running UTF-8 byte budget for the context; we stop adding blocks once it
+    # is spent instead of building the full string and slicing it afterwards.
+    # Sources past the budget are still listed, just without context.
+    remaining = MAX_CONTEXT
 
     for doc in sources or []:
         if len(formatted) >= MAX_SOURCES:
@@ -118,10 +151,28 @@ def _prepare_sources(sources: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]
             continue
 
         doc_id = doc.get("id") or f"S{len(formatted) + 1}"
-        title = (doc.get("title") or doc.get("url") or "Untitled source").strip()
-        source_domain = (doc.get("source") or "web").strip()
+        title = _clean(doc, "title") or _clean(doc, "url", "Untitled source")
+        source_domain = _clean(doc, "source", "web")
         url = doc.get("url")
 
+        if remaining > 0:
+            # Fragments go straight into one flat list joined once at the end,
+            # rather than one f-string per source plus a second join.
+            fragments = (
+                "\n\n" if context_parts else "",
+                "[", doc_id, "] ", title,
+                "\nSource: ", source_domain,
+                "\nURL: ", url or "unknown",
+                "\nContent:\n", content[:MAX_SOURCE_CONTENT], "\n",
+            )
+            size = sum(len(fragment.encode("utf-8")) for fragment in fragments)
+            if size > remaining:
+                truncated = "".join(fragments).encode("utf-8")[:remaining]
+                context_parts.append(truncated.decode("utf-8", errors="ignore"))
+            else:
+                context_parts.extend(fragments)
+            remaining -= size
+
         formatted.append(
             {
                 "id": doc_id,
@@ -132,17 +183,40 @@ def _prepare_sources(sources: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]
             }
         )
 
-        context_blocks.append(
-            f"[{doc_id}] {title}\n"
-            f"Source: {source_domain}\n"
-            f"URL: {url or 'unknown'}\n"
-            f"Content:\n{content[:MAX_SOURCE_CONTENT]}\n"
-        )
-
-    context = "\n\n".join(context_blocks).strip()[:MAX_CONTEXT]
+    context = "".join(context_parts).rstrip()
     return formatted, context
 
 
+def _clean(doc: Dict[str, Any], key: str, default: str = "") -> str:
+    return str(doc.get(key) or "").strip() or default
+
+
+# The prompt template pre-split into constant chunks; each is followed by one
+# dynamic slot, in _compose_user_prompt argument order.
+_PROMPT_CHUNKS: Tuple[str, ...] = (
+    "Candidate profile:\n- Company: ",
+    "\n- Role: ",
+    "\n- Time to interview: ",
+    " hours\n- Guidance: ",
+    "\n\nConversation summary:\n",
+    "\n\nSOURCE CONTEXT (trimmed):\n",
+    "\n\n"
+    "OUTPUT FORMAT (no extra sections, no citations):\n\n"
+    "# 1. OVERALL SUMMARY\n"
+    "(set expectations, reassure anxious candidates)\n\n"
+    "# 2. INTERVIEW FLOW & ROUNDS\n"
+    "(bullets describing the sequence of screens or loops)\n\n"
+    "# 3. QUESTION THEMES & EXAMPLES\n"
+    "(grouped themes with example prompts referencing the sources)\n\n"
+    "# 4. PREP PLAN\n"
+    "(chronological actions tailored to remaining hours)\n\n"
+    "# 5. FINAL TAKEAWAYS\n"
+    "(confidence-building close)\n\n"
+    "Use only the provided context plus conversation. If data is missing, supply reasonable placeholders.\n"
+    "User question:\n",
+)
+
+
 def _compose_user_prompt(
     company: str,
     role: str,
@@ -152,65 +226,35 @@ def _compose_user_prompt(
     context_block: str,
     user_query: str,
 ) -> str:
-    return f"""
-Candidate profile:
-- Company: {company}
-- Role: {role}
-- Time to interview: {time_hours} hours
-- Guidance: {time_guidance}
-
-Conversation summary:
-{conversation_snippet}
-
-SOURCE CONTEXT (trimmed):
-{context_block}
-
-OUTPUT FORMAT (no extra sections, no citations):
-
-# 1. OVERALL SUMMARY
-(set expectations, reassure anxious candidates)
-
-# 2. INTERVIEW FLOW & ROUNDS
-(bullets describing the sequence of screens or loops)
-
-# 3. QUESTION THEMES & EXAMPLES
-(grouped themes with example prompts referencing the sources)
-
-# 4. PREP PLAN
-(chronological actions tailored to remaining hours)
-
-# 5. FINAL TAKEAWAYS
-(confidence-building close)
-
-Use only the provided context plus conversation. If data is missing, supply reasonable placeholders.
-User question:
-{user_query}
-""".strip()
+    values = (
+        company,
+        role,
+        str(time_hours),
+        time_guidance,
+        conversation_snippet,
+        context_block,
+        user_query.strip(),
+    )
+    return "".join(chain.from_iterable(zip(_PROMPT_CHUNKS, values)))
 
 
-def _invoke_bedrock(payload: Dict[str, Any]) -> Dict[str, Any]:
-    response = bedrock.invoke_model(
+def _invoke_bedrock_stream(body: bytes) -> Iterator[str]:
+    response = bedrock.invoke_model_with_response_stream(
         modelId=MODEL_ID,
         accept="application/json",
         contentType="application/json",
-        body=json.dumps(payload),
+        body=body,
     )
-    body = response.get("body")
-    body_bytes = body.read() if hasattr(body, "read") else body
-    if isinstance(body_bytes, (bytes, bytearray)):
-        body_bytes = body_bytes.decode("utf-8")
-    if not body_bytes:
-        raise ValueError("Empty Bedrock body")
-    return json.loads(body_bytes)
-
-
-def _collect_text(response_json: Dict[str, Any]) -> str:
-    content_blocks = response_json.get("content") or []
-    chunks: List[str] = []
-    for block in content_blocks:
-        if isinstance(block, dict) and block.get("type") == "text":
-            chunks.append(block.get("text") or "")
-    return "".join(chunks).strip()
+    for event in response.get("body") or []:
+        chunk = event.get("chunk") if isinstance(event, dict) else None
+        if not chunk or not chunk.get("bytes"):
+            continue
+        data = _json_loads(chunk["bytes"])
+        if data.get("type") != "content_block_delta":
+            continue
+        delta = data.get("delta") or {}
+        if delta.get("type") == "text_delta" and delta.get("text"):
+            yield delta["text"]
 
 
 def _format_history(messages: List[Dict[str, Any]]) -> str:
@@ -0,0 +1,38 @@
+"""
+EdgeCoach AI - Shared AWS clients
+
+This module owns the boto3 clients used across the Lambda. It:
+- Creates one Bedrock runtime client per container, shared by the handler,
+  intent classifier, and analysis engine.
+- Keeps connections alive and bounds retries and timeouts for Bedrock.
+- Optionally marks static system prompts for Bedrock prompt caching.
+"""
+
+import os
+from typing import Any
+
+import boto3
+from botocore.config import Config
+
+# Keep-alive pooled connections and a bounded retry/timeout budget for Bedrock.
+# Adaptive retries also back off client-side when Bedrock starts throttling.
+_BEDROCK_CONFIG = Config(
+    tcp_keepalive=True,
+    max_pool_connections=10,
+    retries={"max_attempts": 2, "mode": "adaptive"},
+    read_timeout=20,
+    connect_timeout=2,
+)
+bedrock = boto3.client("bedrock-runtime", config=_BEDROCK_CONFIG)
+
+# Opt-in Bedrock prompt caching (BEDROCK_PROMPT_CACHING=1). Only models with
+# prompt-caching support accept cache_control, and prompts shorter than the
+# model's minimum cacheable prefix are simply not cached.
+PROMPT_CACHING = os.getenv("BEDROCK_PROMPT_CACHING", "0") == "1"
+
+
+def system_prompt_field(prompt: str) -> Any:
+    """Value for the request's "system" field, marked cacheable when enabled."""
+    if not PROMPT_CACHING:
+        return prompt
+    return [{"type": "text", "text": prompt, "cache_control": {"type": "ephemeral"}}]
@@ -4,28 +4,72 @@ EdgeCoach AI - Intent classifier
 This module calls Claude via Bedrock to extract interview intent signals
 and enrich them with heuristics. It:
 - Builds a structured prompt for company, role, timing, and intent.
-- Parses JSON output safely and clamps missing fields.
+- Forces a single emit_intent tool call and clamps missing fields.
 - Falls back to regex/heuristic extraction when Bedrock fails.
+- Caches model output per prompt, and final intents per normalized query,
+  across warm Lambda invocations.
 """
 
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
 import os
 import re
-from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-import boto3
+from aws_clients import bedrock, system_prompt_field
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import re2  # type: ignore
+except ImportError:  # pragma: no cover
+    re2 = None
 
 MODEL_ID = os.getenv(
     "BEDROCK_INTENT_MODEL_ID",
     "anthropic.claude-3-haiku-20240307-v1:0",
 )
 
-bedrock = boto3.client("bedrock-runtime")
 logger = logging.getLogger(__name__)
 
+
+def _compile(pattern: str, flags: int = 0) -> Any:
+    """
+    Compile with RE2 (linear-time matching) when installed, else stdlib re.
+    google-re2 takes an re2.Options object rather than stdlib flags, so only
+    re.IGNORECASE is translated; any other flag, or a pattern RE2 rejects
+    (e.g. lookarounds), uses stdlib re.
+    """
+    if re2 is not None and not flags & ~re.IGNORECASE:
+        try:
+            options = re2.Options()
+            options.case_sensitive = not flags & re.IGNORECASE
+            options.log_errors = False
+            return re2.compile(pattern, options)
+        except Exception:
+            pass
+    return re.compile(pattern, flags)
+
+
+def _json_dumps(payload: Any) -> bytes:
+    if orjson:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode("utf-8")
+
+
+def _json_loads(raw: Any) -> Any:
+    if orjson:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
 DEFAULT_INTENT: Dict[str, Any] = {
     "company": "",
     "role": "",
@@ -38,6 +82,30 @@ DEFAULT_INTENT: Dict[str, Any] = {
 _MIN_HOURS = 1
 _MAX_HOURS = 336
 _MAX_HISTORY_TURNS = 10
+# The model only needs the latest exchange to tag intent; the heuristics still
+# scan the last _MAX_HISTORY_TURNS. Long assistant turns are cut to a preview.
+_PROMPT_HISTORY_TURNS = 2
+_ASSISTANT_TURN_MAX_CHARS = 400
+_ASSISTANT_TURN_PREVIEW_CHARS = 200
+# In-process response cache, keyed by a hash of the full prompt. Module globals
+# survive between warm Lambda invocations. Set BEDROCK_INTENT_CACHE=0 to disable.
+_CACHE_ENABLED = os.getenv("BEDROCK_INTENT_CACHE", "1") != "0"
+_CACHE_MAX_ENTRIES = 512
+_RESPONSE_CACHE: "OrderedDict[str, Any]" = OrderedDict()
+# Filler-tolerant cache of final intents, keyed by the query's ordered content
+# tokens plus the history digest (so context-dependent intents don't leak).
+_SEMANTIC_CACHE_MAX_ENTRIES = 256
+_SEMANTIC_CACHE: "OrderedDict[str, Any]" = OrderedDict()
+_TOKEN_RE = _compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    {
+        "about", "and", "any", "are", "can", "for", "from", "have", "how", "the",
+        "this", "that", "what", "with", "you", "your", "give", "get", "some", "please",
+        "a", "am", "an", "as", "at", "be", "do", "i", "is", "me", "my", "of", "on", "or",
+        "so", "to",
+    }
+)
+_INTEL_KEYWORDS = ("interview", "intel", "tips", "questions", "process", "prep", "coach", "brief")
 _ROLE_HINTS = {
     "analyst",
     "associate",
@@ -82,30 +150,35 @@ _PHRASE_TO_HOURS: List[Tuple[str, int]] = [
     ("fortnight", 336),
     ("next month", 336),
 ]
-_IN_HOURS_RE = re.compile(r"in\s+(\d+)\s+(?:hours?|hrs?)", re.IGNORECASE)
-_IN_DAYS_RE = re.compile(r"in\s+(\d+)\s+days?", re.IGNORECASE)
-_IN_WEEKS_RE = re.compile(r"in\s+(\d+)\s+weeks?", re.IGNORECASE)
+# One pass finds every "in N <unit>"; the unit, not the position, decides which
+# match wins (hours, then days, then weeks).
+_IN_UNITS_RE = _compile(r"in\s+(\d+)\s+(hours?|hrs?|days?|weeks?)", re.IGNORECASE)
+_UNIT_HOURS = {"h": 1, "d": 24, "w": 168}  # in priority order
 _COMPANY_TOKEN = r"[A-Z][A-Za-z0-9&./+-]*"
 _COMPANY_BODY = rf"{_COMPANY_TOKEN}(?:\s+{_COMPANY_TOKEN}){{0,3}}"
 _ROLE_BODY = r"[A-Za-z][A-Za-z0-9/&+ .-]{0,80}"
-_COMPANY_ROLE_PATTERNS = [
-    re.compile(
-        rf"\bhave\s+(?:an|a)\s+(?P<company>{_COMPANY_BODY})\s+(?P<role>{_ROLE_BODY})\s+interview",
-        re.IGNORECASE,
-    ),
-    re.compile(
-        rf"\binterview\s+with\s+(?P<company>{_COMPANY_BODY})(?:[^.?!]*?\bfor\s+(?P<role>{_ROLE_BODY}))?",
-        re.IGNORECASE,
-    ),
-    re.compile(
-        rf"\binterview\s+at\s+(?P<company>{_COMPANY_BODY})(?:[^.?!]*?\bfor\s+(?P<role>{_ROLE_BODY}))?",
-        re.IGNORECASE,
-    ),
-    re.compile(
-        rf"\b(?P<company>{_COMPANY_BODY})\s+(?P<role>{_ROLE_BODY})\s+interview",
-        re.IGNORECASE,
-    ),
-]
+_COMPANY_ROLE_BRANCHES = (
+    rf"\bhave\s+(?:an|a)\s+(?P<company0>{_COMPANY_BODY})\s+(?P<role0>{_ROLE_BODY})\s+interview",
+    rf"\binterview\s+with\s+(?P<company1>{_COMPANY_BODY})(?:[^.?!]*?\bfor\s+(?P<role1>{_ROLE_BODY}))?",
+    rf"\binterview\s+at\s+(?P<company2>{_COMPANY_BODY})(?:[^.?!]*?\bfor\s+(?P<role2>{_ROLE_BODY}))?",
+)
+# All anchored forms are scanned in one pass. Each branch sits in its own
+# lookahead so a hit never consumes text another branch needs, which keeps the
+# first hit per branch identical to what a separate search() would return.
+# RE2 has no lookaheads, so this one always uses the stdlib engine.
+_COMPANY_ROLE_RE = re.compile(
+    "|".join(f"(?=(?P<b{index}>{branch}))" for index, branch in enumerate(_COMPANY_ROLE_BRANCHES)),
+    re.IGNORECASE,
+)
+# The bare "<Company> <role> interview" form can start at almost any word, so it
+# stays separate and is only searched when the anchored forms did not resolve.
+_COMPANY_ROLE_FALLBACK_RE = _compile(
+    rf"\b(?P<company>{_COMPANY_BODY})\s+(?P<role>{_ROLE_BODY})\s+interview",
+    re.IGNORECASE,
+)
+
+# Filler words and whitespace runs in one pass (see _clean_role).
+_CLEAN_ROLE_RE = _compile(r"\s*\b(?:role|position|job)\b|\s+", re.IGNORECASE)
 
 _SYSTEM_PROMPT = """
 You are IntentJSON, a deterministic classification service operating in strict JSON mode.
@@ -147,6 +220,37 @@ The JSON response must strictly follow:
 }
 """.strip()
 
+# Forcing a single tool call makes Claude return the intent as a structured
+# tool input instead of free text that may carry prose or code fences.
+_INTENT_TOOL: Dict[str, Any] = {
+    "name": "emit_intent",
+    "description": "Record the interview intent extracted from the conversation.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "company": {"type": "string"},
+            "role": {"type": "string"},
+            "time_to_interview_hours": {"type": "integer", "minimum": 1, "maximum": 336},
+            "level": {"type": "string"},
+            "location": {"type": "string"},
+            "wants_interview_intel": {"type": "boolean"},
+        },
+        "required": list(DEFAULT_INTENT),
+    },
+}
+
+# Everything but the user prompt is constant, so the request envelope is
+# serialized once at import and only the user prompt is encoded per call.
+_PAYLOAD_PREFIX = (
+    b'{"anthropic_version":"bedrock-2023-05-31","max_tokens":128,"temperature":0,"system":'
+    + _json_dumps(system_prompt_field(_SYSTEM_PROMPT))
+    + b',"tools":'
+    + _json_dumps([_INTENT_TOOL])
+    + b',"tool_choice":{"type":"tool","name":"emit_intent"}'
+    + b',"messages":[{"role":"user","content":[{"type":"text","text":'
+)
+_PAYLOAD_SUFFIX = b"}]}]}"
+
 
 def extract_intent(user_query: str, history: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
     """
@@ -154,54 +258,109 @@ def extract_intent(user_query: str, history: Optional[List[Dict[str, Any]]] = No
     Returns DEFAULT_INTENT if the model output is missing or invalid.
     """
 
-    user_prompt = _build_user_prompt(user_query, history)
+    # Stringify the history once; the cache key, prompt, and heuristics share it.
+    turns = _materialize_history(history)
 
-    payload = {
-        "anthropic_version": "bedrock-2023-05-31",
-        "max_tokens": 256,
-        "temperature": 0,
-        "system": _SYSTEM_PROMPT,
-        "messages": [
-            {"role": "user", "content": [{"type": "text", "text": user_prompt}]},
-        ],
-    }
+    semantic_key = _semantic_cache_key(user_query, turns)
+    cached_intent = _cache_get(_SEMANTIC_CACHE, semantic_key)
+    if cached_intent is not None:
+        return dict(cached_intent)
+
+    user_prompt = _build_user_prompt(user_query, _format_history(turns))
+    cache_key = _prompt_cache_key(user_prompt)
 
+    from_model = True
     try:
-        response = bedrock.invoke_model(
-            modelId=MODEL_ID,
-            accept="application/json",
-            contentType="application/json",
-            body=json.dumps(payload),
-        )
-        raw_text = _extract_model_text(response)
-        intent = _parse_intent_json(raw_text)
+        tool_input = _cache_get(_RESPONSE_CACHE, cache_key)
+        if tool_input is None:
+            response = bedrock.invoke_model(
+                modelId=MODEL_ID,
+                accept="application/json",
+                contentType="application/json",
+                body=_PAYLOAD_PREFIX + _json_dumps(user_prompt) + _PAYLOAD_SUFFIX,
+            )
+            tool_input = _extract_tool_input(response)
+        intent = _coerce_intent(tool_input)
+        _cache_put(_RESPONSE_CACHE, cache_key, tool_input, _CACHE_MAX_ENTRIES)
     except Exception as exc:
         logger.warning("Claude intent extraction failed; using heuristic fallback: %s", exc)
-        intent = _fallback_intent(user_query, history)
+        intent = _fallback_intent(user_query, turns)
+        from_model = False
+
+    enriched = _enrich_with_context(intent, user_query, turns)
+    if from_model:
+        # Heuristic-only results are not cached, so a Bedrock hiccup doesn't stick.
+        _cache_put(_SEMANTIC_CACHE, semantic_key, dict(enriched), _SEMANTIC_CACHE_MAX_ENTRIES)
+    return enriched
+
 
-    return _enrich_with_context(intent, user_query, history)
+def _prompt_cache_key(user_prompt: str) -> str:
+    return hashlib.blake2b(
+        (_SYSTEM_PROMPT + user_prompt).encode("utf-8"), digest_size=16
+    ).hexdigest()
 
 
-def _build_user_prompt(user_query: str, history: Optional[List[Dict[str, Any]]]) -> str:
-    history_block = _format_history(history)
+def _semantic_cache_key(user_query: str, turns: List[Tuple[str, str]]) -> str:
+    """
+    Filler-insensitive key: lowercase tokens minus stopwords, in their original
+    order, plus the recent history. Order is kept because it carries meaning
+    ("from Google to Meta" vs "from Meta to Google"), and short tokens are
+    kept so role acronyms ("PM" vs "ML") and numbers ("in 2 days") stay distinct. That covers the turns
+    the heuristics scan, not just the shorter window the prompt sends.
+    """
+    tokens = [
+        token
+        for token in _TOKEN_RE.findall((user_query or "").lower())
+        if token not in _STOPWORDS
+    ]
+    history_blob = "\n".join(f"{role}: {content}" for role, content in turns)
+    blob = " ".join(tokens) + "\n" + history_blob
+    return hashlib.blake2b(blob.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _cache_get(cache: "OrderedDict[str, Any]", key: str) -> Any:
+    if not _CACHE_ENABLED:
+        return None
+    cached = cache.get(key)
+    if cached is not None:
+        cache.move_to_end(key)
+    return cached
+
+
+def _cache_put(cache: "OrderedDict[str, Any]", key: str, value: Any, max_entries: int) -> None:
+    if not _CACHE_ENABLED:
+        return
+    cache[key] = value
+    cache.move_to_end(key)
+    if len(cache) > max_entries:
+        cache.popitem(last=False)
+
+
+def _build_user_prompt(user_query: str, history_block: str) -> str:
     return (
         "Conversation history (oldest to newest):\n"
         f"{history_block}\n\n"
         "Latest user message:\n"
         f"{user_query.strip()}\n\n"
-        "Return ONLY the JSON object described in the system prompt."
+        "Call emit_intent with the JSON object described in the system prompt."
     )
 
 
-def _format_history(history: Optional[List[Dict[str, Any]]]) -> str:
+def _materialize_history(history: Optional[List[Dict[str, Any]]]) -> List[Tuple[str, str]]:
+    """(ROLE, content string) pairs for the recent turns the classifier looks at."""
     if not history:
-        return "None."
+        return []
+    return [
+        (str(turn.get("role", "UNKNOWN")).upper(), _stringify_content(turn.get("content", "")))
+        for turn in history[-_MAX_HISTORY_TURNS:]
+    ]
 
-    trimmed = history[-_MAX_HISTORY_TURNS:]
+
+def _format_history(turns: List[Tuple[str, str]]) -> str:
     lines: List[str] = []
-    for turn in trimmed:
-        role = str(turn.get("role", "UNKNOWN")).upper()
-        content = _stringify_content(turn.get("content", ""))
+    for role, content in turns[-_PROMPT_HISTORY_TURNS:]:
+        if role == "ASSISTANT" and len(content) > _ASSISTANT_TURN_MAX_CHARS:
+            content = content[:_ASSISTANT_TURN_PREVIEW_CHARS] + "..."
         lines.append(f"{role}: {content}")
     return "\n".join(lines) if lines else "None."
 
@@ -216,27 +375,23 @@ def _stringify_content(content: Any) -> str:
     return str(content)
 
 
-def _extract_model_text(response: Dict[str, Any]) -> str:
+def _extract_tool_input(response: Dict[str, Any]) -> Dict[str, Any]:
     body = response.get("body")
     body_bytes = body.read() if hasattr(body, "read") else body
-    if isinstance(body_bytes, (bytes, bytearray)):
-        body_bytes = body_bytes.decode("utf-8")
-
-    payload = json.loads(body_bytes or "{}")
-    content_blocks = payload.get("content") or []
-    text_chunks = [
-        block.get("text", "")
-        for block in content_blocks
-        if isinstance(block, dict) and block.get("type") == "text"
-    ]
-    text = "".join(text_chunks).strip()
-    if not text:
-        raise ValueError("Empty model output")
-    return text
 
+    payload = _json_loads(body_bytes or b"{}")
+    for block in payload.get("content") or []:
+        if (
+            isinstance(block, dict)
+            and block.get("type") == "tool_use"
+            and block.get("name") == _INTENT_TOOL["name"]
+        ):
+            return block.get("input")
+    raise ValueError("Model output has no emit_intent tool call")
 
-def _parse_intent_json(raw_text: str) -> Dict[str, Any]:
-    data = json.loads(raw_text)
+
+def _coerce_intent(data: Any) -> Dict[str, Any]:
+    # The schema is a strong hint, not a guarantee, so keep the cheap coercions.
     if not isinstance(data, dict):
         raise ValueError("Model output is not a JSON object")
 
@@ -254,11 +409,12 @@ def _parse_intent_json(raw_text: str) -> Dict[str, Any]:
     }
 
 
-def _fallback_intent(user_query: str, history: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
-    blob_all = _compose_text_blob(user_query, history)
-    blob_current = user_query or ""
+def _fallback_intent(user_query: str, turns: List[Tuple[str, str]]) -> Dict[str, Any]:
+    blob_all = _compose_text_blob(user_query, turns)
+    blob_all_lower = blob_all.lower()
+    blob_current_lower = (user_query or "").lower()
 
-    company, role = _guess_company_role(blob_all)
+    company, role = _guess_company_role(blob_all, blob_all_lower)
 
     fallback = DEFAULT_INTENT.copy()
     if company:
@@ -266,31 +422,35 @@ def _fallback_intent(user_query: str, history: Optional[List[Dict[str, Any]]]) -
     if role:
         fallback["role"] = role
 
-    fallback["time_to_interview_hours"] = _infer_time_hours(blob_all)
-    fallback["wants_interview_intel"] = _infer_wants_interview_intel(blob_current)
+    fallback["time_to_interview_hours"] = _infer_time_hours(blob_all_lower)
+    fallback["wants_interview_intel"] = _infer_wants_interview_intel(blob_current_lower)
 
     return fallback
 
 
 
 
-def _enrich_with_context(intent: Dict[str, Any], user_query: str, history: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
+def _enrich_with_context(intent: Dict[str, Any], user_query: str, turns: List[Tuple[str, str]]) -> Dict[str, Any]:
     enriched = DEFAULT_INTENT.copy()
     enriched.update(intent or {})
 
-    blob_all = _compose_text_blob(user_query, history)
-    blob_current = user_query or ""
-
-    company, role = _guess_company_role(blob_all)
-
-    if not enriched["company"] and company:
-        enriched["company"] = company
-    if not enriched["role"] and role:
-        enriched["role"] = role
-    if not enriched["time_to_interview_hours"]:
-        enriched["time_to_interview_hours"] = _infer_time_hours(blob_all)
-
-    if not enriched["wants_interview_intel"] and _infer_wants_interview_intel(blob_current):
+    # Only run the heuristics for fields the model left empty.
+    needs_company_role = not enriched["company"] or not enriched["role"]
+    needs_time = not enriched["time_to_interview_hours"]
+    if needs_company_role or needs_time:
+        blob_all = _compose_text_blob(user_query, turns)
+        blob_all_lower = blob_all.lower()
+
+        if needs_company_role:
+            company, role = _guess_company_role(blob_all, blob_all_lower)
+            if not enriched["company"] and company:
+                enriched["company"] = company
+            if not enriched["role"] and role:
+                enriched["role"] = role
+        if needs_time:
+            enriched["time_to_interview_hours"] = _infer_time_hours(blob_all_lower)
+
+    if not enriched["wants_interview_intel"] and _infer_wants_interview_intel((user_query or "").lower()):
         enriched["wants_interview_intel"] = True
 
     enriched["time_to_interview_hours"] = _coerce_hours(
@@ -303,11 +463,8 @@ def _enrich_with_context(intent: Dict[str, Any], user_query: str, history: Optio
 
 
 
-def _compose_text_blob(user_query: str, history: Optional[List[Dict[str, Any]]]) -> str:
-    parts: List[str] = []
-    if history:
-        for turn in history[-_MAX_HISTORY_TURNS:]:
-            parts.append(_stringify_content(turn.get("content", "")))
+def _compose_text_blob(user_query: str, turns: List[Tuple[str, str]]) -> str:
+    parts = [content for _, content in turns]
     if user_query:
         parts.append(user_query)
     return " ".join(part for part in parts if part).strip()
@@ -341,21 +498,27 @@ def _coerce_hours(value: Any, default: int) -> int:
     if isinstance(value, bool) or value is None:
         return default
     try:
-        hours = int(float(value))
+        hours = int(value)
     except (TypeError, ValueError):
-        return default
-    return _clamp_hours(hours)
-
-
-def _guess_company_role(text: str) -> Tuple[str, str]:
+        # Slow path for "24.0"-style strings.
+        try:
+            hours = int(float(value))
+        except (TypeError, ValueError):
+            return default
+    if _MIN_HOURS <= hours <= _MAX_HOURS:
+        return hours
+    return _MIN_HOURS if hours < _MIN_HOURS else _MAX_HOURS
+
+
+def _guess_company_role(text: str, lowered: str) -> Tuple[str, str]:
+    # Every company/role pattern needs the word "interview"; skip the scan without it.
+    if "interview" not in lowered:
+        return "", ""
     best_company = ""
     best_role = ""
-    for pattern in _COMPANY_ROLE_PATTERNS:
-        match = pattern.search(text)
-        if not match:
-            continue
-        company = _clean_company(match.group("company") or "")
-        role = _clean_role(match.group("role") or "")
+    for raw_company, raw_role in _company_role_candidates(text):
+        company = _clean_company(raw_company)
+        role = _clean_role(raw_role)
         if company and not best_company:
             best_company = company
         if role and _looks_like_role(role):
@@ -367,16 +530,44 @@ def _guess_company_role(text: str) -> Tuple[str, str]:
     return best_company, best_role
 
 
+def _company_role_candidates(text: str) -> Iterator[Tuple[str, str]]:
+    """Yield raw (company, role) pairs in pattern priority order."""
+    first_hits: Dict[int, Tuple[str, str]] = {}
+    for match in _COMPANY_ROLE_RE.finditer(text):
+        branch = int(match.lastgroup[1:])
+        if branch in first_hits:
+            continue
+        first_hits[branch] = (
+            match.group(f"company{branch}") or "",
+            match.group(f"role{branch}") or "",
+        )
+        if len(first_hits) == len(_COMPANY_ROLE_BRANCHES):
+            break
+    for branch in sorted(first_hits):
+        yield first_hits[branch]
+
+    match = _COMPANY_ROLE_FALLBACK_RE.search(text)
+    if match:
+        yield match.group("company") or "", match.group("role") or ""
+
+
 def _clean_company(candidate: str) -> str:
     cleaned = candidate.strip(" .,!?:;-")
     return cleaned
 
 
 def _clean_role(candidate: str) -> str:
-    role = (candidate or "").strip(" .,!?:;-")
-    role = re.sub(r"\b(role|position|job)\b", "", role, flags=re.IGNORECASE)
-    role = re.sub(r"\s+", " ", role).strip()
-    return role
+    # Edge punctuation is trimmed after the filler words go, so a separator
+    # left dangling by a removed word is dropped too: "software engineer - role"
+    # gives "software engineer" and "data-role" gives "data".
+    role = _CLEAN_ROLE_RE.sub(_clean_role_token, candidate or "")
+    return role.strip(" .,!?:;-")
+
+
+def _clean_role_token(match: Any) -> str:
+    # Filler words vanish together with their leading whitespace; other
+    # whitespace runs collapse to a single space.
+    return " " if match.group(0).isspace() else ""
 
 
 def _looks_like_role(role: str) -> bool:
@@ -386,32 +577,26 @@ def _looks_like_role(role: str) -> bool:
     return any(hint in role_lower for hint in _ROLE_HINTS)
 
 
-def _infer_time_hours(text: str) -> int:
-    lowered = text.lower()
+def _infer_time_hours(lowered: str) -> int:
+    # Phrases are tried in table order, so "tomorrow" beats an earlier "today".
     for phrase, hours in _PHRASE_TO_HOURS:
         if phrase in lowered:
             return hours
 
-    match = _IN_HOURS_RE.search(lowered)
-    if match:
-        return _clamp_hours(int(match.group(1)))
-
-    match = _IN_DAYS_RE.search(lowered)
-    if match:
-        return _clamp_hours(int(match.group(1)) * 24)
-
-    match = _IN_WEEKS_RE.search(lowered)
-    if match:
-        return _clamp_hours(int(match.group(1)) * 168)
+    if "in" in lowered:
+        first_by_unit: Dict[str, Any] = {}
+        for match in _IN_UNITS_RE.finditer(lowered):
+            first_by_unit.setdefault(match.group(2)[0], match)
+        for unit, unit_hours in _UNIT_HOURS.items():
+            match = first_by_unit.get(unit)
+            if match:
+                hours = int(match.group(1)) * unit_hours
+                if _MIN_HOURS <= hours <= _MAX_HOURS:
+                    return hours
+                return _MIN_HOURS if hours < _MIN_HOURS else _MAX_HOURS
 
     return DEFAULT_INTENT["time_to_interview_hours"]
 
 
-def _infer_wants_interview_intel(text: str) -> bool:
-    lowered = text.lower()
-    keywords = ["interview", "intel", "tips", "questions", "process", "prep", "coach", "brief"]
-    return any(keyword in lowered for keyword in keywords)
-
-
-def _clamp_hours(value: int) -> int:
-    return max(_MIN_HOURS, min(_MAX_HOURS, value))
+def _infer_wants_interview_intel(lowered: str) -> bool:
+    return any(keyword in lowered for keyword in _INTEL_KEYWORDS)
@@ -4,58 +4,106 @@ EdgeCoach AI - Lambda handler
 This module defines the AWS Lambda entrypoint for the interview
 intelligence assistant. It:
 - Parses the incoming HTTP event from the Function URL.
-- Restores cached agent state from prior turns.
+- Restores cached agent state echoed back by the client.
 - Calls the intent classifier, retrieval module, and analysis engine.
 - Routes general Q&A queries to a lightweight Bedrock call.
+- Optionally returns newline-delimited JSON events so the UI can render
+  the answer incrementally.
 """
 
 import json
-from typing import Any, Dict, List, Tuple
-
-import boto3
-
-from bedrock_intent import extract_intent as detect_intent
-from tavily_retrieval import fetch_interview_sources
-from analysis_engine import synthesize_interview_answer
-
-STATE_PREFIX = "__agent_state__:"
-bedrock = boto3.client("bedrock-runtime")
-
-
-def _generate_general_answer(user_query: str, messages: List[Dict[str, Any]]) -> str:
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None
+
+from aws_clients import bedrock, system_prompt_field
+from bedrock_intent import DEFAULT_INTENT, extract_intent as detect_intent
+
+GENERAL_MAX_TOKENS = 400
+# Enough for a complete few-paragraph explanation even for one-line questions.
+GENERAL_MIN_TOKENS = 300
+# Pure concept questions ("what is ...", "explain ...") go to general chat.
+_CONCEPT_PREFIXES = (
+    "what is ",
+    "what are ",
+    "explain ",
+    "define ",
+    "how does ",
+    "how do ",
+    "describe ",
+    "difference between ",
+    "compare ",
+    "when is ",
+    "why is ",
+)
+
+
+def _json_dumps(payload: Any) -> str:
+    if orjson:
+        return orjson.dumps(payload).decode("utf-8")
+    return json.dumps(payload)
+
+
+def _json_loads(raw: Any) -> Any:
+    if orjson:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _general_max_tokens(user_query: str) -> int:
+    # Concept answers are short; scale the output budget with the question
+    # instead of always reserving the old 500-token ceiling.
+    return min(GENERAL_MAX_TOKENS, GENERAL_MIN_TOKENS + 2 * len(user_query.split()))
+
+
+def _generate_general_answer(
+    user_query: str,
+    messages: List[Dict[str, Any]],
+    on_delta: Optional[Callable[[str], None]] = None,
+) -> str:
     """
     Use Claude (Bedrock) to answer general-purpose queries when the user
     is NOT asking about interview preparation or interview intel.
+    The answer is read from the response stream; each text delta is passed
+    to `on_delta` as it arrives.
     """
     try:
         payload = {
             "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 500,
-            "temperature": 0.5,
-            "system": "You are a helpful and friendly general-purpose AI assistant. Answer clearly and concisely.",
+            "max_tokens": _general_max_tokens(user_query),
+            "temperature": 0.2,
+            "system": system_prompt_field(
+                "You are a helpful and friendly general-purpose AI assistant. Answer clearly and concisely, "
+                "in at most about 200 words, and always finish your last sentence."
+            ),
             "messages": [
                 {"role": "user", "content": [{"type": "text", "text": user_query}]}
             ],
         }
 
-        response = bedrock.invoke_model(
+        response = bedrock.invoke_model_with_response_stream(
             modelId="anthropic.claude-3-haiku-20240307-v1:0",
             accept="application/json",
             contentType="application/json",
-            body=json.dumps(payload),
+            body=_json_dumps(payload),
         )
 
-        body = response.get("body")
-        body_bytes = body.read() if hasattr(body, "read") else body
-        if isinstance(body_bytes, (bytes, bytearray)):
-            body_bytes = body_bytes.decode("utf-8")
-        response_json = json.loads(body_bytes or "{}")
-
-        chunks = [
-            block.get("text", "")
-            for block in response_json.get("content", [])
-            if isinstance(block, dict) and block.get("type") == "text"
-        ]
+        chunks: List[str] = []
+        for event in response.get("body") or []:
+            chunk = event.get("chunk") if isinstance(event, dict) else None
+            if not chunk or not chunk.get("bytes"):
+                continue
+            data = _json_loads(chunk["bytes"])
+            if data.get("type") != "content_block_delta":
+                continue
+            delta = data.get("delta") or {}
+            if delta.get("type") == "text_delta" and delta.get("text"):
+                chunks.append(delta["text"])
+                if on_delta:
+                    on_delta(delta["text"])
         return "".join(chunks).strip() or "I'm here! How can I help you?"
     except Exception:
         return "I'm here! How can I help you?"
@@ -66,6 +114,8 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         body = _parse_event_body(event)
         user_query = (body.get("query") or "").strip()
         raw_messages = body.get("messages") or []
+        cached_state = _extract_agent_state(body.get("agent_state"))
+        stream_requested = bool(body.get("stream"))
 
         if not user_query:
             return _error_response(400, "Missing 'query' in request body.")
@@ -73,52 +123,34 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         if not isinstance(raw_messages, list):
             return _error_response(400, "'messages' must be a list of turns.")
 
-        # Conversation history without agent-state system messages,
-        # and any cached state that was stored previously.
-        conversation_history, cached_state = _extract_agent_state(raw_messages)
-
-        # --- Intent detection from Bedrock ---
-        latest_intent = detect_intent(
-            user_query,
-            history=conversation_history,
-        )
+        conversation_history = raw_messages
 
         # --- OVERRIDE: treat pure concept questions as general chat ---
-        q_lower = user_query.lower().strip()
-        concept_prefixes = (
-            "what is ",
-            "what are ",
-            "explain ",
-            "define ",
-            "how does ",
-            "how do ",
-            "describe ",
-            "difference between ",
-            "compare ",
-            "when is ",
-            "why is ",
-        )
+        q_lower = user_query.lower()
         is_concept_question = (
-            any(q_lower.startswith(p) for p in concept_prefixes)
+            q_lower.startswith(_CONCEPT_PREFIXES)
             and "interview" not in q_lower
             and "round" not in q_lower
         )
 
-        if not isinstance(latest_intent, dict):
-            latest_intent = {}
-
         if is_concept_question:
-            # Force this turn to be handled as general Q&A,
-            # not as interview intel, and clear any stale interview state.
-            latest_intent["wants_interview_intel"] = False
-            latest_intent["company"] = ""
-            latest_intent["role"] = ""
+            # Routing is already decided, so skip the intent model call.
+            # Handle this turn as general Q&A and clear any stale interview state.
+            latest_intent = {**DEFAULT_INTENT, "wants_interview_intel": False}
 
             cached_state = {
                 "company": "",
                 "role": "",
                 "sources": [],
             }
+        else:
+            # --- Intent detection from Bedrock ---
+            latest_intent = detect_intent(
+                user_query,
+                history=conversation_history,
+            )
+            if not isinstance(latest_intent, dict):
+                latest_intent = {}
 
         # Append the current user message for downstream steps
         history_with_user = conversation_history + [
@@ -127,7 +159,12 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
 
         # === GENERAL CHAT MODE ROUTING ===
         if not latest_intent.get("wants_interview_intel", False):
-            general_answer = _generate_general_answer(user_query, history_with_user)
+            general_deltas: List[str] = []
+            general_answer = _generate_general_answer(
+                user_query,
+                history_with_user,
+                on_delta=general_deltas.append if stream_requested else None,
+            )
             updated_history = history_with_user + [
                 {"role": "assistant", "content": general_answer}
             ]
@@ -139,12 +176,20 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 "messages": updated_history,
             }
 
+            if stream_requested:
+                return _stream_response(general_deltas, response_payload)
+
             return {
                 "statusCode": 200,
-                "body": json.dumps(response_payload),
+                "body": _json_dumps(response_payload),
             }
 
         # === INTERVIEW-INTEL FLOW (with Tavily) ===
+        # Imported here so general-chat invocations and cold starts skip the
+        # retrieval/extraction dependency tree entirely.
+        from tavily_retrieval import fetch_interview_sources
+        from analysis_engine import synthesize_interview_answer
+
         company = (latest_intent.get("company") or "").strip()
         role = (latest_intent.get("role") or "").strip()
 
@@ -169,11 +214,13 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             elif not sources:
                 sources = []
 
+        answer_deltas: List[str] = []
         answer_payload = synthesize_interview_answer(
             user_query=user_query,
             intent=latest_intent,
             sources=sources,
             messages=history_with_user,
+            on_delta=answer_deltas.append if stream_requested else None,
         )
 
         answer_markdown = answer_payload.get("answer_markdown", "")
@@ -181,23 +228,24 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             {"role": "assistant", "content": answer_markdown}
         ]
 
-        agent_state_message = _build_agent_state_message(
-            company=company,
-            role=role,
-            sources=sources,
-        )
-        updated_history.append(agent_state_message)
-
         response_payload = {
             "intent": latest_intent,
             "answer": answer_markdown,
             "sources": answer_payload.get("sources", []),
             "messages": updated_history,
+            "agent_state": {
+                "company": company,
+                "role": role,
+                "sources": sources,
+            },
         }
 
+        if stream_requested:
+            return _stream_response(answer_deltas, response_payload)
+
         return {
             "statusCode": 200,
-            "body": json.dumps(response_payload),
+            "body": _json_dumps(response_payload),
         }
 
     except Exception as exc:
@@ -208,7 +256,7 @@ def _parse_event_body(event: Dict[str, Any]) -> Dict[str, Any]:
     body_value = event.get("body") or {}
     if isinstance(body_value, str):
         try:
-            return json.loads(body_value)
+            return _json_loads(body_value)
         except json.JSONDecodeError:
             return {}
     if isinstance(body_value, dict):
@@ -216,54 +264,41 @@ def _parse_event_body(event: Dict[str, Any]) -> Dict[str, Any]:
     return {}
 
 
-def _extract_agent_state(messages: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
-    cleaned_messages: List[Dict[str, Any]] = []
+def _extract_agent_state(data: Any) -> Dict[str, Any]:
     agent_state: Dict[str, Any] = {
         "company": "",
         "role": "",
         "sources": [],
     }
-
-    for message in messages:
-        if (
-            isinstance(message, dict)
-            and message.get("role") == "system"
-            and isinstance(message.get("content"), str)
-            and message["content"].startswith(STATE_PREFIX)
-        ):
-            state_content = message["content"][len(STATE_PREFIX):]
-            try:
-                data = json.loads(state_content)
-                if isinstance(data, dict):
-                    agent_state.update(
-                        {
-                            "company": data.get("company", ""),
-                            "role": data.get("role", ""),
-                            "sources": data.get("sources", []),
-                        }
-                    )
-            except json.JSONDecodeError:
-                continue
-        else:
-            cleaned_messages.append(message)
-
-    return cleaned_messages, agent_state
+    if isinstance(data, dict):
+        agent_state.update(
+            {
+                "company": data.get("company", ""),
+                "role": data.get("role", ""),
+                "sources": data.get("sources", []),
+            }
+        )
+    return agent_state
 
 
-def _build_agent_state_message(company: str, role: str, sources: List[Dict[str, Any]]) -> Dict[str, Any]:
-    payload = {
-        "company": company,
-        "role": role,
-        "sources": sources,
-    }
+def _stream_response(deltas: List[str], payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Newline-delimited JSON body: one {"type": "delta"} event per answer chunk,
+    followed by a {"type": "final"} event carrying the regular response payload.
+    The body is only returned once generation has finished, so the events reach
+    the client together; this is the wire format, not incremental delivery.
+    """
+    lines = [_json_dumps({"type": "delta", "text": delta}) for delta in deltas]
+    lines.append(_json_dumps({"type": "final", **payload}))
     return {
-        "role": "system",
-        "content": f"{STATE_PREFIX}{json.dumps(payload)}",
+        "statusCode": 200,
+        "headers": {"Content-Type": "application/x-ndjson"},
+        "body": "\n".join(lines) + "\n",
     }
 
 
 def _error_response(status: int, message: str) -> Dict[str, Any]:
     return {
         "statusCode": status,
-        "body": json.dumps({"error": message}),
+        "body": _json_dumps({"error": message}),
     }
@@ -6,38 +6,126 @@ This module queries Tavily and fetches external URLs for interview intel. It:
 - Fetches pages (HTML/PDF), cleans text, and trims to safe length.
 - Returns deduplicated sources with id, title, snippet, domain, and content.
 """
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, NamedTuple, Optional
+import importlib
 import io
+import json
 import logging
 import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
 from urllib.parse import urlparse
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 try:
-    import trafilatura  # type: ignore
+    import orjson  # type: ignore
 except ImportError:  # pragma: no cover
-    trafilatura = None
+    orjson = None
 
 try:
-    from PyPDF2 import PdfReader  # type: ignore
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser  # type: ignore
 except ImportError:  # pragma: no cover
-    PdfReader = None
+    HTMLParser = None
 
-try:
-    from bs4 import BeautifulSoup  # type: ignore
-except ImportError:  # pragma: no cover
-    BeautifulSoup = None
+# trafilatura, bs4 and the PDF libraries are only needed as fallbacks or for
+# PDFs, so they are imported on first use (see _optional_module) to keep them
+# off the cold-start path.
 
 
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY", "")
 TAVILY_URL = "https://api.tavily.com/search"
+TAVILY_EXTRACT_URL = "https://api.tavily.com/extract"
+# Raw page text inflates every search response although pages are re-fetched
+# anyway. By default it is left out and Tavily's extractor is only asked for
+# pages whose direct fetch fails. Set TAVILY_INCLUDE_RAW_CONTENT=1 to restore it.
+_INCLUDE_RAW_CONTENT = os.getenv("TAVILY_INCLUDE_RAW_CONTENT", "0") == "1"
+# Fields shared by every search request; only query and max_results vary.
+_BASE_SEARCH_PAYLOAD: Dict[str, Any] = {
+    "api_key": TAVILY_API_KEY,
+    "search_depth": "advanced",
+    "include_raw_content": _INCLUDE_RAW_CONTENT,
+}
+_JSON_HEADERS = {"Content-Type": "application/json"}
 _MAX_CONTENT_CHARS = 10_000
 _MIN_CONTENT_CHARS = 300
+# Raw text is cut to this before cleaning; the slack covers whitespace that
+# cleaning collapses, so the cleaned result still fills _MAX_CONTENT_CHARS.
+_CLEAN_INPUT_CHARS = _MAX_CONTENT_CHARS * 2
 _REQUEST_TIMEOUT = 15
+_SEARCH_WORKERS = 2
+# Download caps: only _MAX_CONTENT_CHARS survive extraction, so larger bodies are
+# not read. A truncated PDF is unparseable, so oversized PDFs are skipped.
+_MAX_HTML_BYTES = 1_000_000
+_MAX_PDF_BYTES = 5_000_000
+_DOWNLOAD_CHUNK_BYTES = 64 * 1024
+# Scanned or image-heavy PDFs yield little text per page, so the character
+# budget alone would still walk every page; this bounds the CPU spent on them.
+_MAX_PDF_PAGES = 30
+# Warm-container caches: finished source lists per (company, role, max_sources)
+# and extracted text per URL. Only non-empty results are stored, with a TTL so
+# fresh interview reports still show up.
+_CACHE_TTL_SECONDS = 60 * 60
+_SOURCES_CACHE_MAX_ENTRIES = 64
+_URL_CACHE_MAX_ENTRIES = 256
+_SOURCES_CACHE: "OrderedDict[Any, Any]" = OrderedDict()
+_URL_CACHE: "OrderedDict[Any, Any]" = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+# Runs of whitespace plus control, format, separator, surrogate and private-use
+# characters (what str.isprintable() rejects, minus unassigned code points).
+_NON_PRINTABLE_RE = re.compile(
+    r"[\s\x00-\x1f\x7f-\x9f\xad\u0600-\u0605\u061c\u06dd\u070f\u0890\u0891\u08e2\u180e"
+    r"\u200b-\u200f\u2028-\u202e\u2060-\u206f\ufeff\ufff9-\ufffb\ud800-\udfff\ue000-\uf8ff"
+    r"\U000110bd\U000110cd\U00013430-\U00013438\U0001bca0-\U0001bca3\U0001d173-\U0001d17a"
+    r"\U000e0001\U000e0020-\U000e007f\U000f0000-\U000ffffd\U00100000-\U0010fffd]+"
+)
+# Login-walled or script-rendered sites that never yield usable page text.
+_BLOCKED_DOMAINS = frozenset(
+    {"linkedin.com", "indeed.com", "quora.com", "facebook.com", "instagram.com", "x.com", "twitter.com"}
+)
+# Sites with first-hand interview reports; their hits are taken first.
+_PREFERRED_DOMAINS = frozenset(
+    {"glassdoor.com", "reddit.com", "leetcode.com", "geeksforgeeks.org", "interviewing.io"}
+)
+# Removed with their contents before selectolax reads the page text.
+_BOILERPLATE_TAGS = ["script", "style", "noscript", "nav", "header", "footer", "aside", "form"]
+# Only content-bearing tags are built into the BeautifulSoup tree.
+_CONTENT_TAGS = ["article", "main", "p", "h1", "h2", "h3", "li"]
 
 logger = logging.getLogger(__name__)
+# Shared by the search and fetch workers so connections are kept alive and pooled.
+# POST is retried too: a Tavily search has no side effects.
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=32,
+        max_retries=Retry(
+            total=2,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=frozenset({"GET", "POST"}),
+        ),
+    ),
+)
+
+
+class Candidate(NamedTuple):
+    """A Tavily search hit waiting to be fetched."""
+
+    url: str
+    title: str
+    snippet: str
+    source: str
+    raw_content: str
+    content: str
 
 
 def fetch_interview_sources(
@@ -60,6 +148,11 @@ def fetch_interview_sources(
         logger.warning("Neither company nor role provided; skipping Tavily call.")
         return []
 
+    cache_key = (company.lower(), role.lower(), max_sources)
+    cached_sources = _cache_get(_SOURCES_CACHE, cache_key)
+    if cached_sources is not None:
+        return [dict(source) for source in cached_sources]
+
     queries = [
         f"{company} {role} interview experience".strip(),
         f"{company} {role} interview process".strip(),
@@ -68,78 +161,79 @@ def fetch_interview_sources(
         f"interview tips for {company}".strip(),
     ]
 
-    raw_candidates: List[Dict[str, Any]] = []
+    raw_candidates: List[Candidate] = []
     seen_urls = set()
-
-    for query in queries:
-        if len(raw_candidates) >= max_sources:
-            break
-        payload = {
-            "api_key": TAVILY_API_KEY,
-            "query": query,
-            "search_depth": "advanced",
-            "include_raw_content": True,
-            "max_results": max_sources,
-        }
-        try:
-            response = requests.post(
-                TAVILY_URL,
-                headers={"Content-Type": "application/json"},
-                json=payload,
-                timeout=_REQUEST_TIMEOUT,
-            )
-            response.raise_for_status()
-            data = response.json()
-        except (requests.RequestException, ValueError) as exc:
-            logger.warning("Tavily search failed for query '%s': %s", query, exc)
-            continue
-
-        for item in data.get("results", []):
-            if len(raw_candidates) >= max_sources:
-                break
-
-            url = (item.get("url") or "").strip()
-            if not url or url in seen_urls:
-                continue
-            seen_urls.add(url)
-
-            fallback_title = f"{company} {role}".strip() or "Interview source"
-            title = (item.get("title") or url or fallback_title).strip()
-            snippet = (
-                item.get("snippet")
-                or item.get("content")
-                or item.get("answer")
-                or title
-                or ""
-            ).strip()
-
-            raw_candidates.append(
-                {
-                    "url": url,
-                    "title": title,
-                    "snippet": snippet,
-                    "source": _derive_source(url),
-                    "raw_content": item.get("raw_content") or "",
-                    "content": item.get("content") or "",
-                }
-            )
-
-    if not raw_candidates:
-        return []
-
+    fetch_futures: Dict[Any, Candidate] = {}
     enriched_sources: List[Dict[str, Any]] = []
-    max_workers = min(4, len(raw_candidates))
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_map = {
-            executor.submit(_fetch_url_content, candidate): candidate for candidate in raw_candidates
-        }
-        for future in as_completed(future_map):
-            candidate = future_map[future]
+
+    # The first (most specific) query usually fills max_sources on its own, so
+    # it is sent alone; the broader queries only go out when it comes up short,
+    # at most _SEARCH_WORKERS at a time, and none are sent once enough
+    # candidates are in (each one costs Tavily credits). Results are consumed
+    # in query order so earlier queries keep priority, and each page fetch
+    # starts as soon as its candidate is accepted.
+    stop = threading.Event()
+    search_pool = ThreadPoolExecutor(max_workers=_SEARCH_WORKERS)
+    fetch_pool = ThreadPoolExecutor(max_workers=max_sources)
+    try:
+        search_futures = [(queries[0], search_pool.submit(_tavily_search, queries[0], max_sources))]
+        index = 0
+        while index < len(search_futures) and len(raw_candidates) < max_sources:
+            query, future = search_futures[index]
+            index += 1
+            try:
+                results = future.result()
+            except (requests.RequestException, ValueError) as exc:
+                logger.warning("Tavily search failed for query '%s': %s", query, exc)
+                results = []
+
+            # Within one query, hits from preferred sites go first (stable sort
+            # keeps Tavily's order otherwise); blocked sites are never fetched.
+            for item in sorted(results, key=_result_rank):
+                if len(raw_candidates) >= max_sources:
+                    break
+
+                url = (item.get("url") or "").strip()
+                if not url or url in seen_urls:
+                    continue
+                seen_urls.add(url)
+                source = _derive_source(url)
+                if _domain_score(source) < 0:
+                    continue
+
+                fallback_title = f"{company} {role}".strip() or "Interview source"
+                title = (item.get("title") or url or fallback_title).strip()
+                snippet = (
+                    item.get("snippet")
+                    or item.get("content")
+                    or item.get("answer")
+                    or title
+                    or ""
+                ).strip()
+
+                candidate = Candidate(
+                    url=url,
+                    title=title,
+                    snippet=snippet,
+                    source=source,
+                    raw_content=item.get("raw_content") or "",
+                    content=item.get("content") or "",
+                )
+                raw_candidates.append(candidate)
+                fetch_futures[fetch_pool.submit(_fetch_url_content, candidate, stop)] = candidate
+
+            if len(raw_candidates) < max_sources:
+                while len(search_futures) < min(len(queries), index + _SEARCH_WORKERS):
+                    extra = queries[len(search_futures)]
+                    search_futures.append((extra, search_pool.submit(_tavily_search, extra, max_sources)))
+
+        for future in as_completed(fetch_futures):
+            candidate = fetch_futures[future]
             content = ""
             try:
                 content = future.result()
             except Exception as exc:  # pragma: no cover
-                logger.warning("Content fetching crashed for %s: %s", candidate.get("url"), exc)
+                logger.warning("Content fetching crashed for %s: %s", candidate.url, exc)
 
             if not content:
                 continue
@@ -147,90 +241,273 @@ def fetch_interview_sources(
             enriched_sources.append(
                 {
                     "id": f"S{len(enriched_sources) + 1}",
-                    "url": candidate["url"],
-                    "title": candidate["title"],
-                    "source": candidate["source"],
-                    "snippet": candidate["snippet"],
+                    "url": candidate.url,
+                    "title": candidate.title,
+                    "source": candidate.source,
+                    "snippet": candidate.snippet,
                     "content": content[:_MAX_CONTENT_CHARS],
                 }
             )
 
             if len(enriched_sources) >= max_sources:
                 break
-
+    finally:
+        # Leftover searches and downloads are no longer needed: drop queued
+        # work and tell running fetches to stop at their next chunk.
+        stop.set()
+        search_pool.shutdown(wait=False, cancel_futures=True)
+        fetch_pool.shutdown(wait=False, cancel_futures=True)
+
+    if enriched_sources:
+        _cache_put(
+            _SOURCES_CACHE,
+            cache_key,
+            [dict(source) for source in enriched_sources],
+            _SOURCES_CACHE_MAX_ENTRIES,
+        )
     return enriched_sources
 
 
-def _fetch_url_content(candidate: Dict[str, Any]) -> str:
+def _cache_get(cache: "OrderedDict[Any, Any]", key: Any) -> Any:
+    with _CACHE_LOCK:
+        entry = cache.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.monotonic() - stored_at > _CACHE_TTL_SECONDS:
+            del cache[key]
+            return None
+        cache.move_to_end(key)
+        return value
+
+
+def _cache_put(cache: "OrderedDict[Any, Any]", key: Any, value: Any, max_entries: int) -> None:
+    with _CACHE_LOCK:
+        cache[key] = (time.monotonic(), value)
+        cache.move_to_end(key)
+        if len(cache) > max_entries:
+            cache.popitem(last=False)
+
+
+def _json_dumps(payload: Any) -> bytes:
+    if orjson:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode("utf-8")
+
+
+def _json_loads(raw: bytes) -> Any:
+    """
+    Parse a response body with orjson when available, stdlib otherwise.
+    orjson.JSONDecodeError subclasses ValueError, so callers catch one type.
+    """
+    if orjson:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _tavily_search(query: str, max_results: int) -> List[Dict[str, Any]]:
+    payload = {**_BASE_SEARCH_PAYLOAD, "query": query, "max_results": max_results}
+    response = _SESSION.post(
+        TAVILY_URL,
+        headers=_JSON_HEADERS,
+        data=_json_dumps(payload),
+        timeout=_REQUEST_TIMEOUT,
+    )
+    response.raise_for_status()
+    return _json_loads(response.content).get("results", [])
+
+
+def _tavily_extract(url: str) -> str:
+    payload = {"api_key": TAVILY_API_KEY, "urls": [url]}
+    try:
+        response = _SESSION.post(
+            TAVILY_EXTRACT_URL,
+            headers=_JSON_HEADERS,
+            data=_json_dumps(payload),
+            timeout=_REQUEST_TIMEOUT,
+        )
+        response.raise_for_status()
+        results = _json_loads(response.content).get("results") or []
+    except (requests.RequestException, ValueError) as exc:
+        logger.info("Tavily extract failed for %s: %s", url, exc)
+        return ""
+    return (results[0].get("raw_content") or "") if results else ""
+
+
+def _fetch_url_content(candidate: Candidate, stop: Optional[threading.Event] = None) -> str:
     """
     Fetch and extract high-quality text from a URL with multiple fallbacks.
+    Returns "" early once `stop` is set.
     """
-    url = candidate.get("url", "")
+    url = candidate.url
     if not url:
         return ""
 
+    cached_text = _cache_get(_URL_CACHE, url)
+    if cached_text is not None:
+        return cached_text
+
+    # Tavily already scraped the page (raw-content mode): skip the round trip.
+    raw_text = _clean_text(candidate.raw_content[:_CLEAN_INPUT_CHARS])
+    if len(raw_text) >= _MIN_CONTENT_CHARS:
+        raw_text = raw_text[:_MAX_CONTENT_CHARS]
+        _cache_put(_URL_CACHE, url, raw_text, _URL_CACHE_MAX_ENTRIES)
+        return raw_text
+
     fallback_texts = [
-        candidate.get("raw_content", ""),
-        candidate.get("content", ""),
-        candidate.get("snippet", ""),
+        candidate.raw_content,
+        candidate.content,
+        candidate.snippet,
     ]
 
     cleaned_text = ""
     try:
-        response = requests.get(
+        with _SESSION.get(
             url,
             headers={"User-Agent": "InterviewIntelAgent/1.0"},
             timeout=_REQUEST_TIMEOUT,
-        )
-        response.raise_for_status()
-        content_type = (response.headers.get("Content-Type") or "").lower()
-
-        if "pdf" in content_type or url.lower().endswith(".pdf"):
-            cleaned_text = _load_pdf(response.content)
+            stream=True,
+        ) as response:
+            response.raise_for_status()
+            content_type = (response.headers.get("Content-Type") or "").lower()
+            is_pdf = "pdf" in content_type or url.lower().endswith(".pdf")
+            limit = _MAX_PDF_BYTES if is_pdf else _MAX_HTML_BYTES
+            body = _read_capped(response, limit, stop)
+            encoding = response.encoding or "utf-8"
+        if stop is not None and stop.is_set():
+            return ""
+
+        if is_pdf:
+            if len(body) > limit:
+                logger.info("Skipping PDF larger than %d bytes: %s", limit, url)
+            else:
+                cleaned_text = _load_pdf(body)
         else:
-            page_text = response.text
-            cleaned_text = _extract_via_trafilatura(page_text, url)
-            if not cleaned_text:
-                cleaned_text = _extract_via_bs4(page_text)
+            page_text = _decode_body(body[:limit], encoding)
+            # The cheap C parser handles well-structured pages; trafilatura's
+            # heavier analysis only runs when that comes up short.
+            cleaned_text = _extract_via_selectolax(page_text)
+            if len(cleaned_text) < _MIN_CONTENT_CHARS:
+                cleaned_text = _extract_via_trafilatura(page_text, url) or cleaned_text
+            if len(cleaned_text) < _MIN_CONTENT_CHARS:
+                cleaned_text = _extract_via_bs4(page_text) or cleaned_text
 
     except requests.RequestException as exc:
         logger.info("HTTP fetch failed for %s: %s", url, exc)
 
+    if not cleaned_text and not fallback_texts[0]:
+        fallback_texts[0] = _tavily_extract(url)
+
     if not cleaned_text:
         for fallback in fallback_texts:
-            cleaned_fallback = _clean_text(fallback)
+            cleaned_fallback = _clean_text(fallback[:_CLEAN_INPUT_CHARS])
             if len(cleaned_fallback) >= _MIN_CONTENT_CHARS:
                 cleaned_text = cleaned_fallback
                 break
 
-    cleaned_text = _clean_text(cleaned_text)
+    cleaned_text = _clean_text(cleaned_text[:_CLEAN_INPUT_CHARS])
     if len(cleaned_text) < _MIN_CONTENT_CHARS:
         return ""
 
-    return cleaned_text[:_MAX_CONTENT_CHARS]
+    cleaned_text = cleaned_text[:_MAX_CONTENT_CHARS]
+    _cache_put(_URL_CACHE, url, cleaned_text, _URL_CACHE_MAX_ENTRIES)
+    return cleaned_text
+
+
+def _read_capped(
+    response: requests.Response,
+    limit: int,
+    stop: Optional[threading.Event] = None,
+) -> bytes:
+    """
+    Read at most `limit` + 1 decoded bytes, so callers can tell a capped body
+    from one that fit exactly. Stops early once `stop` is set.
+    """
+    chunks: List[bytes] = []
+    total = 0
+    for chunk in response.iter_content(chunk_size=_DOWNLOAD_CHUNK_BYTES):
+        if stop is not None and stop.is_set():
+            break
+        chunks.append(chunk)
+        total += len(chunk)
+        if total > limit:
+            break
+    return b"".join(chunks)[: limit + 1]
+
+
+def _decode_body(body: bytes, encoding: str) -> str:
+    try:
+        return body.decode(encoding, errors="replace")
+    except LookupError:
+        return body.decode("utf-8", errors="replace")
+
+
+@lru_cache(maxsize=None)
+def _optional_module(*names: str) -> Any:
+    """
+    Import the first available module among `names`, or return None.
+    """
+    for name in names:
+        try:
+            return importlib.import_module(name)
+        except ImportError:
+            continue
+    return None
 
 
 def _load_pdf(content: bytes) -> str:
-    if not PdfReader:
-        logger.info("PyPDF2 not installed; skipping PDF extraction.")
+    pymupdf = _optional_module("pymupdf")
+    if pymupdf:
+        text = _load_pdf_via_pymupdf(pymupdf, content)
+        if text:
+            return text
+    pdf_module = _optional_module("pypdf", "PyPDF2")
+    if not pdf_module:
+        logger.info("pypdf/PyPDF2 not installed; skipping PDF extraction.")
         return ""
     try:
-        reader = PdfReader(io.BytesIO(content))  # type: ignore
+        reader = pdf_module.PdfReader(io.BytesIO(content))
     except Exception as exc:  # pragma: no cover
         logger.info("Failed to load PDF: %s", exc)
         return ""
 
     text_chunks: List[str] = []
-    for page in reader.pages:
+    total = 0
+    for index, page in enumerate(reader.pages):
+        if index >= _MAX_PDF_PAGES:
+            break
         try:
             text = page.extract_text() or ""
         except Exception:  # pragma: no cover
             text = ""
         text_chunks.append(text)
-    return _clean_text("\n".join(text_chunks))
+        total += len(text)
+        if total >= _CLEAN_INPUT_CHARS:
+            break
+    return _clean_text("\n".join(text_chunks)[:_CLEAN_INPUT_CHARS])
+
+
+def _load_pdf_via_pymupdf(pymupdf: Any, content: bytes) -> str:
+    text_chunks: List[str] = []
+    total = 0
+    try:
+        with pymupdf.open(stream=content, filetype="pdf") as doc:
+            for index, page in enumerate(doc):
+                if index >= _MAX_PDF_PAGES:
+                    break
+                text = page.get_text() or ""
+                text_chunks.append(text)
+                total += len(text)
+                if total >= _CLEAN_INPUT_CHARS:
+                    break
+    except Exception as exc:  # pragma: no cover
+        logger.info("PyMuPDF extraction failed: %s", exc)
+        return ""
+    return _clean_text("\n".join(text_chunks)[:_CLEAN_INPUT_CHARS])
 
 
 def _extract_via_trafilatura(page_text: str, url: str) -> str:
+    trafilatura = _optional_module("trafilatura")
     if not trafilatura:
         return ""
     try:
@@ -240,17 +517,41 @@ def _extract_via_trafilatura(page_text: str, url: str) -> str:
         return ""
 
 
+def _extract_via_selectolax(page_text: str) -> str:
+    if not HTMLParser:
+        return ""
+    try:
+        tree = HTMLParser(page_text)
+        if tree.body is None:
+            return ""
+        tree.strip_tags(_BOILERPLATE_TAGS)
+        # Every <article> (listings hold one per review/post), else every
+        # <main>, else the page's paragraphs; never the whole <body>, whose
+        # leftover chrome would crowd out the content.
+        nodes = tree.css("article") or tree.css("main") or tree.css("p")
+        return " ".join(node.text(separator=" ", strip=True) for node in nodes)
+    except Exception as exc:  # pragma: no cover
+        logger.info("selectolax extraction failed: %s", exc)
+        return ""
+
+
 def _extract_via_bs4(page_text: str) -> str:
-    if not BeautifulSoup:
+    bs4 = _optional_module("bs4")
+    if not bs4:
         return ""
     try:
-        soup = BeautifulSoup(page_text, "html.parser")
+        strainer = bs4.SoupStrainer(_CONTENT_TAGS)
+        try:
+            soup = bs4.BeautifulSoup(page_text, "lxml", parse_only=strainer)
+        except bs4.FeatureNotFound:
+            soup = bs4.BeautifulSoup(page_text, "html.parser", parse_only=strainer)
         return soup.get_text(separator=" ", strip=True)
     except Exception as exc:  # pragma: no cover
         logger.info("BeautifulSoup extraction failed: %s", exc)
         return ""
 
 
+@lru_cache(maxsize=1024)
 def _derive_source(url: str) -> str:
     try:
         parsed = urlparse(url)
@@ -262,18 +563,27 @@ def _derive_source(url: str) -> str:
         return "web"
 
 
+def _domain_score(source: str) -> int:
+    """
+    -1 for blocked domains, 1 for preferred ones, 0 otherwise; subdomains count.
+    """
+    parts = source.split(".")
+    for i in range(len(parts) - 1):
+        domain = ".".join(parts[i:])
+        if domain in _BLOCKED_DOMAINS:
+            return -1
+        if domain in _PREFERRED_DOMAINS:
+            return 1
+    return 0
+
+
+def _result_rank(item: Dict[str, Any]) -> int:
+    return -_domain_score(_derive_source((item.get("url") or "").strip()))
+
+
 def _clean_text(text: Optional[str]) -> str:
     if not text:
         return ""
-    stripped = "".join(ch if ch.isprintable() else " " for ch in str(text))
-    collapsed = []
-    last_space = False
-    for char in stripped:
-        if char.isspace():
-            if not last_space:
-                collapsed.append(" ")
-            last_space = True
-        else:
-            collapsed.append(char)
-            last_space = False
-    return "".join(collapsed).strip()
+    if not isinstance(text, str):
+        text = str(text)
+    return _NON_PRINTABLE_RE.sub(" ", text).strip()